@@ -1,10 +1,19 @@
+import asyncio
 import httpx
 import datetime
 import pandas as pd
 import logging
+import random
+
+# orjson decodes large payloads much faster than the stdlib parser, but the
+# module should still work from an environment without it installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Importing util functions
-from utils.client_utils import get_menus_df, get_orders_df
+from utils.client_utils import get_menus_df, build_menus_lookup, process_orders_page, build_orders_df
 
 class ToastAPIClient:
     def __init__(self, base_url, client_id, client_secret, restaurant_guid):
@@ -16,11 +25,81 @@ class ToastAPIClient:
 
         # Token management
         self.token = None
-        self.token_expires_at = None
+        self.token_refresh_at = None
+
+        # Lock so only one coroutine refreshes the token while others await it
+        self._auth_lock = asyncio.Lock()
 
         # Attribute to save dataframe of menus_df that will loaded with get_menu() and be used in get_orders()
         self.menus_df = None
 
+        # Cached (item_guid, item_group_guid) lookup built alongside menus_df so
+        # repeated get_orders() calls do not rebuild it from the DataFrame each time
+        self._menus_lookup = None
+
+        # ETag of the last menus response; sent back as If-None-Match so an
+        # unchanged menu comes back as a bodyless 304 and skips re-parsing
+        self._menus_etag = None
+
+        # Persistent HTTP client so every request reuses one keep-alive connection pool
+        # instead of paying a fresh TCP+TLS handshake per call (important for pagination).
+        # HTTP/2 lets the concurrent page fetches multiplex over one or two connections
+        # instead of opening a socket each
+        self._client = httpx.AsyncClient(base_url=f"https://{self.base_url}",
+                                         http2=True,
+                                         limits=httpx.Limits(max_keepalive_connections=10,
+                                                             max_connections=20),
+                                         timeout=httpx.Timeout(30.0, connect=5.0))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP client and release its pooled connections."""
+        await self._client.aclose()
+
+    async def _request_with_retry(self, method: str, url: str, max_attempts: int = 5, **kwargs) -> httpx.Response:
+        """
+        Send an HTTP request, retrying on rate limits and transient server errors.
+
+        A 429 response sleeps for the server-provided Retry-After (falling back to
+        exponential backoff) before retrying; 5xx responses retry with exponential
+        backoff plus jitter. Any other response is returned to the caller as-is,
+        including 4xx errors, which are not retryable. The last response is
+        returned if all attempts are exhausted.
+
+        Args:
+            method (str): HTTP method, e.g. "GET" or "POST".
+            url (str): Path relative to the client's base URL.
+            max_attempts (int): Maximum number of attempts before giving up.
+            **kwargs: Passed through to httpx (headers, params, json, ...).
+
+        Returns:
+            httpx.Response: The first non-retryable response received.
+        """
+        for attempt in range(max_attempts):
+            response = await self._client.request(method, url, **kwargs)
+
+            # Rate limited: respect the server's Retry-After if provided
+            if response.status_code == 429:
+                delay = float(response.headers.get("Retry-After", 2 ** attempt))
+                logging.info(f"Rate limited on {url}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+            # Transient server error: exponential backoff with a little jitter
+            elif 500 <= response.status_code < 600:
+                delay = 0.2 * 2 ** attempt + random.random() * 0.1
+                logging.info(f"Server error {response.status_code} on {url}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+            else:
+                return response
+
+        return response
+
     async def authenticate(self):
         """
         Authenticate the client with the Toast API and obtain an OAuth2 access token.
@@ -30,15 +109,16 @@ class ToastAPIClient:
         - Otherwise, a new token is requested from the Toast authentication endpoint
           using the client credentials.
 
-        The token and its expiration time are stored on the client instance for reuse
-        in subsequent API calls. A 60-second buffer is applied to the expiration time
-        to account for network latency and ensure the token does not expire mid-request.
+        The token and its refresh deadline are stored on the client instance for reuse
+        in subsequent API calls. The token is proactively refreshed at 80% of its
+        lifetime so it never expires mid-request, and the refresh itself is guarded
+        by a lock so concurrent callers trigger only one authentication request.
 
         Returns:
             str: The active OAuth2 access token.
 
         Raises:
-            ValueError: If the authentication request fails (non-200 response).
+            httpx.HTTPStatusError: If the authentication request fails (non-2xx response).
             httpx.RequestError: If there is a network-related error during the request.
 
         Example:
@@ -47,34 +127,41 @@ class ToastAPIClient:
             >>> print(token)  # Use this token in subsequent API requests
         """
 
-        # If token is still valid, return it
-        if self.token and self.token_expires_at and self.token_expires_at > datetime.datetime.now():
+        # If token is still fresh, return it without touching the lock
+        if self.token and self.token_refresh_at and self.token_refresh_at > datetime.datetime.now():
             return self.token
 
-        # Otherwise, fetch a new token
-        auth_endpoint = f"https://{self.base_url}/authentication/v1/authentication/login"
-        
-        # Create request body to get a new token
-        request_body = {"clientId":self.client_id,
-                        "clientSecret":self.client_secret,
-                        "userAccessType": "TOAST_MACHINE_CLIENT"}
-        
-        # Make the authentication request
-        response = httpx.post(auth_endpoint, json=request_body)
+        # Otherwise, fetch a new token; the lock ensures only one coroutine refreshes
+        # while any concurrent callers wait here and reuse the token it fetched
+        async with self._auth_lock:
 
-        # Raise an error if the request failed
-        if not response.status_code == 200:
-            raise ValueError("Authentication failed", response.status_code, response.text)
-        
-        # Parse the response and store the token and its expiration time (in seconds)
-        auth_data = response.json()
-        self.token = auth_data["token"]['accessToken']
-        experation_seconds = auth_data["token"]['expiresIn']
+            # Re-check after acquiring the lock in case another coroutine just refreshed
+            if self.token and self.token_refresh_at and self.token_refresh_at > datetime.datetime.now():
+                return self.token
+
+            auth_endpoint = "/authentication/v1/authentication/login"
+
+            # Create request body to get a new token
+            request_body = {"clientId":self.client_id,
+                            "clientSecret":self.client_secret,
+                            "userAccessType": "TOAST_MACHINE_CLIENT"}
 
-        # Set the token expiration time to the exact time it will expire, since we cannot refresh the expiration time ourselves
-        self.token_expires_at = datetime.datetime.now() + datetime.timedelta(seconds=experation_seconds-60) # ToastAPI allows a 60 second buffer
+            # Make the authentication request
+            response = await self._request_with_retry("POST", auth_endpoint, json=request_body)
 
-        return self.token
+            # Raise an error if the request failed; any 2xx counts as success
+            response.raise_for_status()
+
+            # Parse the response and store the token and its expiration time (in seconds)
+            auth_data = response.json()
+            self.token = auth_data["token"]['accessToken']
+            experation_seconds = auth_data["token"]['expiresIn']
+
+            # Refresh at 80% of the token lifetime so it can never expire mid-request,
+            # since we cannot refresh the expiration time ourselves
+            self.token_refresh_at = datetime.datetime.now() + datetime.timedelta(seconds=experation_seconds*0.8)
+
+            return self.token
     
     async def get_menus(self) -> pd.DataFrame|None:
         """
@@ -112,20 +199,38 @@ class ToastAPIClient:
             logging.info(f"Authentication failed while fetching menus: {e}")
             return None
 
-        menus_endpoint = f"https://{self.base_url}/menus/v2/menus"
+        menus_endpoint = "/menus/v2/menus"
 
         try:
             headers = {"Authorization": f"Bearer {token}",
                        "Toast-Restaurant-External-ID": self.restaurant_guid}
 
+            # If we already hold a parsed menu, ask the server to skip the body
+            # when nothing has changed since that version
+            if self._menus_etag and self.menus_df is not None:
+                headers["If-None-Match"] = self._menus_etag
+
             # Send a GET Request to get all menus
-            response = httpx.get(menus_endpoint, headers=headers)
+            response = await self._request_with_retry("GET", menus_endpoint, headers=headers)
 
-            # Extract a dataframe from menus
-            menus_df = get_menus_df(response)
+            # Menu unchanged since the cached version: reuse the parsed DataFrame
+            if response.status_code == 304:
+                return self.menus_df
 
-            # Set client's menus_df attribute to menus_df
+            # Raise an error if the request failed; any 2xx counts as success
+            response.raise_for_status()
+
+            # Remember the version tag of this response for the next request
+            self._menus_etag = response.headers.get("ETag")
+
+            # Extract a dataframe from menus; built in a worker thread so parsing a
+            # large payload does not block the event loop for other coroutines
+            menus_df = await asyncio.to_thread(get_menus_df, response)
+
+            # Set client's menus_df attribute to menus_df and cache the enrichment
+            # lookup so get_orders() can reuse it without rebuilding
             self.menus_df = menus_df
+            self._menus_lookup = build_menus_lookup(menus_df)
 
             return self.menus_df
         
@@ -133,7 +238,7 @@ class ToastAPIClient:
             logging.info(f"An error occurred while fetching orders: {e}")
             return None
 
-    async def get_orders(self, startDate: str, endDate: str, page_size: int = 100) -> pd.DataFrame|None:
+    async def get_orders(self, startDate: str, endDate: str, page_size: int = 100, concurrency: int = 8) -> pd.DataFrame|None:
         """
         Retrieve all orders from the Toast API within a given date range for a specific restaurant
         and return them as a structured Pandas DataFrame.
@@ -146,6 +251,11 @@ class ToastAPIClient:
         Args:
             startDate (str): The start date (ISO 8601 format) for filtering orders.
             endDate (str): The end date (ISO 8601 format) for filtering orders.
+            page_size (int): Number of orders requested per page.
+            concurrency (int): How many page requests to keep in flight at once.
+                Since the total page count is unknown up front, pages are fetched
+                in windows of this size; at most `concurrency - 1` pages past the
+                end of the data are requested before the loop stops.
 
         Returns:
             pandas.DataFrame: A DataFrame containing order and item-level details, including
@@ -167,62 +277,97 @@ class ToastAPIClient:
             logging.info(f"Authentication failed while fetching menus: {e}")
             return None
         
-        orders_endpoint = f"https://{self.base_url}/orders/v2/ordersBulk"
+        orders_endpoint = "/orders/v2/ordersBulk"
 
         headers = {
             "Authorization": f"Bearer {token}",
             "Toast-Restaurant-External-ID": self.restaurant_guid
         }
 
-        # Initialize a list to collect all orders across multiple pages
-        all_orders = []
-        # Start with the first page of results
-        page = 1
-
-        try:
-            while True:
-                # Define query parameters for the API request, including pagination
-                params = {
-                    "startDate": startDate,   # Start date filter for orders
-                    "endDate": endDate,       # End date filter for orders
-                    "page": page,             # Current page number
-                    "pageSize": page_size     # Number of results per page
-                }
-
-                # Send GET request to the Toast Orders API with authentication headers and query params
-                response = httpx.get(orders_endpoint, headers=headers, params=params)
-
-                # If the request fails, raise an error with details
-                if response.status_code != 200:
-                    raise ValueError(f"Failed to fetch orders: {response.status_code}, {response.text}")
+        # Base query parameters for the API request; the page number is added per request
+        base_params = {
+            "startDate": startDate,   # Start date filter for orders
+            "endDate": endDate,       # End date filter for orders
+            "pageSize": page_size     # Number of results per page
+        }
 
-                # Parse the JSON response into a Python object (list of orders for this page)
-                orders_page = response.json()
+        # Limit how many page requests are in flight at once so we don't overwhelm the API
+        sem = asyncio.Semaphore(concurrency)
 
-                # If no orders are returned, stop fetching (end of available data)
-                if not orders_page:
-                    break
+        async def fetch_page(page: int) -> list:
+            """Fetch a single page of orders, returning the parsed list of orders."""
+            async with sem:
+                params = {**base_params, "page": page}
+                response = await self._request_with_retry("GET", orders_endpoint, headers=headers, params=params)
 
-                # Add the current page of orders to the master list
-                all_orders.extend(orders_page)
+                # Raise an error if the request failed; any 2xx counts as success
+                response.raise_for_status()
 
-                # If fewer results than the page size are returned, it means this is the last page
-                if len(orders_page) < page_size:
-                    break
+                # Parse the JSON response into a Python object (list of orders for this page);
+                # orjson decodes large pages much faster than the stdlib json parser
+                if orjson is not None:
+                    return orjson.loads(response.content)
+                return response.json()
 
-                # Otherwise, increment the page number and continue fetching
-                page += 1
+        # Initialize a list to collect the flattened order rows across all pages;
+        # each page is processed as soon as it arrives so the raw JSON can be
+        # dropped immediately instead of holding every order dict in memory
+        rows = []
 
-            # After getting all orders, use client's get_menus() method to get menus_df if needed
+        try:
+            # The menus metadata is needed to enrich each page, so make sure it is
+            # available before any page is processed
             if self.menus_df is None:
                 menus_df = await self.get_menus()
                 if menus_df is None:
                     raise ValueError("Failed to fetch menus, cannot proceed with orders.")
-            else:
-                menus_df = self.menus_df
 
-            # Convert to DataFrame
-            orders_df = get_orders_df(all_orders, menus_df)
+            # Reuse the lookup cached by get_menus(); only rebuild if it is missing
+            # (e.g. menus_df was assigned directly)
+            if self._menus_lookup is None:
+                self._menus_lookup = build_menus_lookup(self.menus_df)
+            menus_lookup = self._menus_lookup
+
+            # Probe the first page alone: most date ranges fit in one page, and this
+            # tells us immediately whether there is anything to paginate at all
+            first_page = await fetch_page(1)
+            first_page_len = len(first_page)
+            process_orders_page(first_page, menus_lookup, rows)
+            del first_page
+
+            if first_page_len >= page_size:
+                # More pages may exist; fetch them concurrently in windows of
+                # `concurrency` pages. Each window is dispatched with asyncio.gather,
+                # and we stop once any page in the window comes back short (or
+                # empty), which marks the end
+                next_page = 2
+                window = concurrency
+                done = False
+
+                while not done:
+                    pages = range(next_page, next_page + window)
+                    results = await asyncio.gather(*(fetch_page(p) for p in pages))
+
+                    for orders_page in results:
+                        # If no orders are returned, stop fetching (end of available data)
+                        if not orders_page:
+                            done = True
+                            break
+
+                        # Flatten the current page into rows right away
+                        process_orders_page(orders_page, menus_lookup, rows)
+
+                        # If fewer results than the page size are returned, it means this is the last page
+                        if len(orders_page) < page_size:
+                            done = True
+                            break
+
+                    # Otherwise, move the window forward and continue fetching
+                    next_page += window
+
+            # Convert the collected rows to a DataFrame; built in a worker thread so
+            # a large build does not block the event loop for other coroutines
+            orders_df = await asyncio.to_thread(build_orders_df, rows)
             return orders_df
 
         except httpx.HTTPError as e:
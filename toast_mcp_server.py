@@ -6,6 +6,13 @@ from toast_api_client import ToastAPIClient
 # Importing helper functions from utils
 from utils.tools_utils import get_date_range
 
+# orjson serializes datetimes and numpy scalars natively and much faster than
+# the default encoder; fall back to FastMCP's own serialization without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Loading api credentials from environment variables
 from dotenv import load_dotenv
 load_dotenv()
@@ -179,9 +186,11 @@ async def get_product_mix(start_date: str, end_date: str, restaurant: str | None
     if restaurant:
         orders_df = orders_df.loc[orders_df["restaurant_name"].str.lower() == restaurant.lower(), :]
 
-    # Use Pandas groupby unique items and calculate number of items sold (quantity) and total revenue by item
+    # Use Pandas groupby unique items and calculate number of items sold (quantity) and total revenue by item;
+    # item_group_name is categorical, so observed=True keeps groups from other
+    # restaurants' categories out of the result after the filter above
     grouped = (
-        orders_df.groupby("item_group_name")
+        orders_df.groupby("item_group_name", observed=True)
         .agg(quantity_sold=("item_group_name", "count"),
              total_revenue=("item_price", "sum"))
         .reset_index()
@@ -193,15 +202,25 @@ async def get_product_mix(start_date: str, end_date: str, restaurant: str | None
     return item_groups
 
 @mcp.resource("toast://menus")
-async def get_menus_resource() -> list[dict]:
+async def get_menus_resource() -> list[dict] | str:
     """
     MCP Resource that exposes the ToastTab Menus as a list of dictionaries.
     Each dictionary represents a menu item with its details.
+
+    When orjson is available the records are serialized to a JSON string here,
+    which handles numpy scalars natively and skips the slower default encoder;
+    the resource content on the wire is the same either way.
     """
     menus_df = await client.get_menus()
     if menus_df is None or menus_df.empty:
         return []
-    return menus_df.to_dict(orient="records")
+
+    records = menus_df.to_dict(orient="records")
+
+    if orjson is not None:
+        return orjson.dumps(records, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    return records
 
 if __name__ == "__main__":
     # Initialize and run the server
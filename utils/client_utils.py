@@ -1,5 +1,15 @@
+from collections.abc import Iterable
+
 import httpx
 import pandas as pd
+import pyarrow as pa
+
+# orjson decodes large payloads much faster than the stdlib parser, but the
+# module should still work from an environment without it installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 def get_menus_df(menus_response: httpx.Response) -> pd.DataFrame:
     """
     Transform a Toast API menus response into a structured Pandas DataFrame.
@@ -11,10 +21,9 @@ def get_menus_df(menus_response: httpx.Response) -> pd.DataFrame:
     sales reporting, item popularity, and price analysis.
 
     Due to a known Toast API bug, some `menuGroups` may contain nested `menuGroups`
-    instead of listing all items directly. To address this, the function includes
-    an additional parsing step that iterates through these nested groups to ensure
-    all items are captured. Without this fix, certain items would be missing from
-    the DataFrame.
+    instead of listing all items directly. To address this, the traversal walks the
+    group tree with an explicit stack so items are captured at any nesting depth.
+    Without this fix, certain items would be missing from the DataFrame.
 
     Args:
         menus_response (httpx.Response): The HTTP response object returned from
@@ -37,73 +46,240 @@ def get_menus_df(menus_response: httpx.Response) -> pd.DataFrame:
         0   abc1234         grp5678   Brownie     MyRestaurant        Dessert       3.99
         1   def5678         grp5678     Cake     MyRestaurant        Dessert       4.99
     """
-    # Initializing a dictionary to store data to convert to a DataFrame
-    columns_dict={"item_guid":[],
-                  "item_group_guid":[],
-                  "item_name":[],
-                  "restaurant_name":[],
-                  "item_group_name":[],
-                  "item_price":[]}
-    
-    # Getting json from the menus_response
-    menus_json = menus_response.json()
+    # Accumulating one tuple per menu item; a single flat list is cheaper to grow
+    # than six parallel lists and lets pandas build all columns in one pass.
+    # The bound extend is hoisted to a local so the hot loop skips the
+    # attribute resolution on every group
+    rows = []
+    extend_rows = rows.extend
+
+    # Getting json from the menus_response; orjson decodes large payloads much
+    # faster than the stdlib json parser behind response.json()
+    if orjson is not None:
+        menus_json = orjson.loads(menus_response.content)
+    else:
+        menus_json = menus_response.json()
     
     # Looping through each menu that represents a single restaurant
     for menu in menus_json["menus"]:
         # Getting restaurant name from the name of the menu
         restaurant_name = menu["name"]
 
-        # Looping through each item group (ex. Dessert) through each menu
-        for item_group in menu["menuGroups"]:
+        # Walking the item groups (ex. Dessert) with an explicit stack; the API Bug
+        # where item groups contain nesting menuGroups can nest arbitrarily deep, so
+        # a DFS handles every level with a single loop body instead of one
+        # copy-pasted block per depth
+        stack = list(menu["menuGroups"])
+
+        while stack:
+            item_group = stack.pop()
 
             # Get item_group guid and item_group name
             item_group_guid = item_group["guid"]
             item_group_name = item_group["name"]
 
-            # Looping through each item in item group
-            for item in item_group['menuItems']:
-
-                # Get item guid, item name, and item price
-                item_guid = item["guid"]
-                item_name = item["name"]
-                item_price = item["price"]
-
-                # Append values to the columns_dict
-                columns_dict["item_guid"].append(item_guid)
-                columns_dict["item_group_guid"].append(item_group_guid)
-                columns_dict["item_name"].append(item_name)
-                columns_dict["restaurant_name"].append(restaurant_name)
-                columns_dict["item_group_name"].append(item_group_name)
-                columns_dict["item_price"].append(item_price)
-
-            # API Bug Fix for where there are nesting menuGroups in an item_group
-            # This is to get the individual items in the nesting menuGroups
-            for sub_item_group in item_group["menuGroups"]:
-                # Get item_group guid and item_group name
-                sub_item_group_guid = sub_item_group["guid"]
-                sub_item_group_name = sub_item_group["name"]
-
-                # Looping through each item in item group
-                for sub_item in sub_item_group['menuItems']:
-
-                    # Get item guid, item name, and item price
-                    sub_item_guid = sub_item["guid"]
-                    sub_item_name = sub_item["name"]
-                    sub_item_price = sub_item["price"]
-
-                    # Append values to the columns_dict
-                    columns_dict["item_guid"].append(sub_item_guid)
-                    columns_dict["item_group_guid"].append(sub_item_group_guid)
-                    columns_dict["item_name"].append(sub_item_name)
-                    columns_dict["restaurant_name"].append(restaurant_name)
-                    columns_dict["item_group_name"].append(sub_item_group_name)
-                    columns_dict["item_price"].append(sub_item_price)
-
-    menus_df = pd.DataFrame.from_dict(data=columns_dict)
-    
+            # Emit one row per item with its guid, name, and price; a single
+            # extend per group replaces one append call per item
+            extend_rows((item["guid"], item_group_guid, item["name"],
+                         restaurant_name, item_group_name, item["price"])
+                        for item in item_group['menuItems'])
+
+            # Push any nested menuGroups so their items are captured too
+            stack.extend(item_group.get("menuGroups", ()))
+
+    # Transpose the row tuples into columns and build typed Arrow arrays; Arrow
+    # assembles the buffers in C and hands pandas ready-made columns, which is
+    # much cheaper than pd.DataFrame boxing every value from Python tuples
+    columns = list(zip(*rows)) if rows else [()] * 6
+
+    table = pa.table({
+        "item_guid": pa.array(columns[0], type=pa.string()),
+        "item_group_guid": pa.array(columns[1], type=pa.string()),
+        "item_name": pa.array(columns[2], type=pa.string()),
+        # Both name columns repeat a handful of unique strings across every row;
+        # dictionary encoding becomes a pandas categorical on conversion, which
+        # shrinks memory and speeds up downstream groupby/filtering
+        "restaurant_name": pa.array(columns[3], type=pa.string()).dictionary_encode(),
+        "item_group_name": pa.array(columns[4], type=pa.string()).dictionary_encode(),
+        "item_price": pa.array(columns[5], type=pa.float64()),
+    })
+
+    # Keep the columns Arrow-backed in pandas: strings stay in contiguous UTF-8
+    # buffers instead of one boxed Python object per value, and the dictionary
+    # columns keep their integer codes
+    menus_df = table.to_pandas(types_mapper=pd.ArrowDtype)
+
     return menus_df
 
-def get_orders_df(all_orders: list[dict], menus_df: pd.DataFrame) -> pd.DataFrame:
+# How many rows go into each Arrow record batch when building the orders table;
+# bounds how much data is transposed and duplicated at once
+_ARROW_BATCH_ROWS = 65536
+
+# Schema of the Arrow orders table, used to build an empty table when no rows exist
+_ORDERS_SCHEMA = pa.schema([
+    ("item_guid", pa.string()),
+    ("item_group_guid", pa.string()),
+    ("item_name", pa.string()),
+    ("item_price", pa.float64()),
+    ("order_guid", pa.string()),
+    ("paid_date", pa.timestamp("us", tz="UTC")),
+    ("restaurant_name", pa.dictionary(pa.int32(), pa.string())),
+    ("item_group_name", pa.dictionary(pa.int32(), pa.string())),
+])
+
+# Shared sentinel for absent nested objects in the per-selection hot loop;
+# reusing one empty dict avoids allocating a throwaway `or {}` dict per miss
+_EMPTY: dict = {}
+
+def build_menus_lookup(menus_df: pd.DataFrame) -> dict[tuple, tuple]:
+    """
+    Build a dictionary mapping (item_guid, item_group_guid) to
+    (restaurant_name, item_group_name) from a menus DataFrame.
+
+    This lookup is what enriches each order selection with its restaurant and
+    item group metadata. A plain dict probe per row is much cheaper than a
+    pandas merge for the typical case of a small menu joined against a large
+    batch of orders.
+
+    Args:
+        menus_df (pandas.DataFrame): A DataFrame of menu metadata, typically
+            generated by `get_menus_df()`.
+
+    Returns:
+        dict[tuple, tuple]: Mapping of (item_guid, item_group_guid) to
+        (restaurant_name, item_group_name).
+    """
+    return dict(zip(zip(menus_df["item_guid"], menus_df["item_group_guid"]),
+                    zip(menus_df["restaurant_name"], menus_df["item_group_name"])))
+
+def process_orders_page(orders_page: Iterable[dict], menus_lookup: dict[tuple, tuple], rows: list[tuple]) -> None:
+    """
+    Flatten one page of Toast order objects into row tuples, appending in place.
+
+    Processing each page as soon as it arrives (instead of accumulating every
+    raw order dict first) keeps peak memory bounded to the row tuples plus a
+    single page of JSON, rather than the entire raw response.
+
+    Each row tuple contains: item_guid, item_group_guid, item_name, item_price,
+    order_guid, paid_date (raw ISO string), restaurant_name, item_group_name.
+    Only orders with an APPROVED approval status are included.
+
+    Args:
+        orders_page (Iterable[dict]): One page of order objects from the Toast
+            Orders API. Any iterable works, including a generator, since the
+            orders are consumed in a single pass.
+        menus_lookup (dict[tuple, tuple]): Mapping built by `build_menus_lookup()`.
+        rows (list[tuple]): The row accumulator to append to in place.
+    """
+    # Hoisting the bound methods used once per selection to locals so the hot
+    # loop does a fast local load instead of a dict lookup plus attribute
+    # resolution on every row
+    append_row = rows.append
+    lookup_get = menus_lookup.get
+
+    # Looping through each order
+    for order in orders_page:
+
+        # Skip orders that were not approved (hence not paid for) before doing
+        # any per-check or per-selection work on them
+        if order["approvalStatus"] != "APPROVED":
+            continue
+
+        # Getting order guid
+        order_guid = order["guid"]
+
+        # Keeping the paid date as its raw ISO string; the whole column is
+        # parsed in one vectorized pd.to_datetime call in build_orders_df
+        paid_date = order["paidDate"]
+
+        # Looping through each check in each order; since some orders are split for separate checks
+        for check in order["checks"]:
+
+            # Looping through item selection in each check
+            for item in check["selections"]:
+
+                # Getting item name, price, guid, and group guid safely; the shared
+                # _EMPTY sentinel stands in for absent nested objects so no dict is
+                # allocated and no helper call is paid per field
+                item_name = item.get("displayName")
+                item_price = item.get("price")
+                item_obj = item.get("item", _EMPTY) or _EMPTY
+                item_group_obj = item.get("itemGroup", _EMPTY) or _EMPTY
+                item_guid = item_obj.get("guid")
+                item_group_guid = item_group_obj.get("guid")
+
+                # Look up the restaurant and item group names from the menus
+                restaurant_name, item_group_name = lookup_get(
+                    (item_guid, item_group_guid), (None, None))
+
+                # Append one row per ordered item
+                append_row((item_guid, item_group_guid, item_name,
+                            item_price, order_guid, paid_date,
+                            restaurant_name, item_group_name))
+
+def build_orders_df(rows: list[tuple], return_format: str = "pandas") -> pd.DataFrame|pa.Table:
+    """
+    Build the final orders table from row tuples collected by `process_orders_page`.
+
+    By default a pandas DataFrame is returned for the MCP tools. Analytical
+    consumers (DuckDB, Parquet, Polars) can pass `return_format="arrow"` to get
+    a pyarrow Table built directly from the column lists instead, which skips
+    the pandas block manager and dictionary-encodes the low-cardinality
+    restaurant/item group columns natively.
+
+    Args:
+        rows (list[tuple]): Row tuples accumulated across all order pages.
+        return_format (str): Either "pandas" (default) or "arrow".
+
+    Returns:
+        pandas.DataFrame | pyarrow.Table: Enriched order details with parsed
+        paid dates and dictionary-encoded/categorical restaurant and item group
+        columns.
+    """
+    if return_format == "arrow":
+        # Build the table in fixed-size record batches so only one chunk of rows
+        # is ever transposed and duplicated at a time, keeping peak memory
+        # bounded regardless of how many order pages were collected
+        batches = []
+        for start in range(0, len(rows), _ARROW_BATCH_ROWS):
+            columns = list(zip(*rows[start:start + _ARROW_BATCH_ROWS]))
+
+            # Parse the chunk's paid dates in one vectorized call, as in the pandas path
+            paid_dates = pd.to_datetime(pd.Index(columns[5]), utc=True,
+                                        format="ISO8601", cache=True)
+
+            batches.append(pa.record_batch({
+                "item_guid": pa.array(columns[0], type=pa.string()),
+                "item_group_guid": pa.array(columns[1], type=pa.string()),
+                "item_name": pa.array(columns[2], type=pa.string()),
+                "item_price": pa.array(columns[3], type=pa.float64()),
+                "order_guid": pa.array(columns[4], type=pa.string()),
+                "paid_date": pa.array(paid_dates),
+                # Dictionary-encode the two low-cardinality string columns
+                "restaurant_name": pa.array(columns[6], type=pa.string()).dictionary_encode(),
+                "item_group_name": pa.array(columns[7], type=pa.string()).dictionary_encode(),
+            }))
+
+        return pa.Table.from_batches(batches, schema=batches[0].schema if batches else _ORDERS_SCHEMA)
+
+    # Getting a dataframe from the rows we collected
+    orders_df = pd.DataFrame(rows, columns=["item_guid", "item_group_guid", "item_name",
+                                            "item_price", "order_guid", "paid_date",
+                                            "restaurant_name", "item_group_name"])
+
+    # Parse all paid dates in one vectorized call; cache=True dedupes repeated
+    # timestamps since every selection in an order shares the same paidDate
+    orders_df["paid_date"] = pd.to_datetime(orders_df["paid_date"], utc=True,
+                                            format="ISO8601", cache=True)
+
+    # Both columns repeat a handful of unique strings across every row, so storing
+    # them as categoricals shrinks memory and speeds up downstream groupby/filtering
+    orders_df["restaurant_name"] = orders_df["restaurant_name"].astype("category")
+    orders_df["item_group_name"] = orders_df["item_group_name"].astype("category")
+
+    return orders_df
+
+def get_orders_df(all_orders: Iterable[dict], menus_df: pd.DataFrame) -> pd.DataFrame:
     """
     Transform a list of Toast API order objects into a structured Pandas DataFrame.
 
@@ -113,16 +289,21 @@ def get_orders_df(all_orders: list[dict], menus_df: pd.DataFrame) -> pd.DataFram
     The function flattens this nested structure into a tabular format, where each
     row represents a single item purchased in an order.
 
-    To enrich the order data with contextual information, the function performs
-    a left join with the provided `menus_df` DataFrame. This adds restaurant-level
-    and item group metadata (e.g., restaurant name, item group name) to each order
-    item, enabling downstream analytics such as sales reporting, revenue aggregation,
-    and item popularity analysis.
+    To enrich the order data with contextual information, the function builds a
+    dictionary keyed by (item_guid, item_group_guid) from the provided `menus_df`
+    DataFrame and looks each selection up as it is processed. This adds
+    restaurant-level and item group metadata (e.g., restaurant name, item group
+    name) to each order item, enabling downstream analytics such as sales
+    reporting, revenue aggregation, and item popularity analysis. A plain dict
+    probe per row is much cheaper than a pandas merge for the typical case of a
+    small menu joined against a large batch of orders.
 
     Args:
-        all_orders (list[dict]): A list of order objects returned by the Toast Orders API.
+        all_orders (Iterable[dict]): Order objects returned by the Toast Orders API.
             Each order should include approval status, order GUID, paid date, checks,
-            and item selections.
+            and item selections. Any single-pass iterable works, including a
+            generator over paginated responses, so callers do not have to
+            materialize every order up front.
         menus_df (pandas.DataFrame): A DataFrame of menu metadata, typically generated
             by `get_menus_df()`. Must include `item_guid` and `item_group_guid` columns
             for joining, along with restaurant and item group details.
@@ -147,57 +328,11 @@ def get_orders_df(all_orders: list[dict], menus_df: pd.DataFrame) -> pd.DataFram
         0   abc1234         grp5678   Brownie        3.99  order_00123 2024-09-01     MyRestaurant        Dessert
         1   def5678         grp5678     Cake        4.99  order_00123 2024-09-01     MyRestaurant        Dessert
     """
-    # Initializing a dictionary to store data of all individual orderd items to convert to a DataFrame
-    columns_dict={"item_guid":[],
-                  "item_group_guid":[],
-                  "item_name":[],
-                  "item_price":[],
-                  "order_guid":[],
-                  "paid_date":[]}
+    # Accumulating one tuple per ordered item; a single flat list is cheaper to grow
+    # than six parallel lists and lets pandas build all columns in one pass
+    rows = []
 
-    # Looping through each order
-    for order in all_orders:
-
-        # Only add orders that have approved; hence they are paid for
-        if order["approvalStatus"] == "APPROVED":
-            
-            # Getting order guid
-            order_guid = order["guid"]
-
-            # Getting order paid date
-            paid_date = pd.to_datetime(order["paidDate"])
-
-            # Looping through each check in each order; since some orders are split for separate checks
-            for check in order["checks"]:
-
-                # Looping through item selection in each check
-                for item in check["selections"]:
-                    
-                    # Getting item name, price, guid, and group guid safely
-                    item_name = item.get("displayName")
-                    item_price = item.get("price")
-                    item_guid = (item.get("item") or {}).get("guid")
-                    item_group_guid = (item.get("itemGroup") or {}).get("guid")
-
-                    # Append values to the columns_dict
-                    columns_dict["item_guid"].append(item_guid)
-                    columns_dict["item_group_guid"].append(item_group_guid)
-                    columns_dict["item_name"].append(item_name)
-                    columns_dict["item_price"].append(item_price)
-                    columns_dict["order_guid"].append(order_guid)
-                    columns_dict["paid_date"].append(paid_date)
-
-    # Getting a dataframe from the dict we created
-    orders_df = pd.DataFrame.from_dict(data=columns_dict)
-
-    # Dropping item name and item price from menus_df to get only the restaurant name and item group name
-    menus_subset_df = menus_df.drop(columns=["item_name", "item_price"])
-
-    # Using menus_df to get restaurant name and item group name, use left join
-    joined_orders_df = pd.merge(orders_df,
-                                menus_subset_df,
-                                on=["item_guid", "item_group_guid"],
-                                how="left")
+    # Flatten every order into row tuples enriched via the menus lookup
+    process_orders_page(all_orders, build_menus_lookup(menus_df), rows)
 
-    
-    return joined_orders_df
+    return build_orders_df(rows)
@@ -1,14 +1,30 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
+
+def _format_toast_timestamp(dt: datetime) -> str:
+    """
+    Formats a UTC datetime (with microsecond=0) in the Toast API required format.
+
+    Since the timestamps here are always UTC with zeroed microseconds, the
+    millisecond and offset parts are constant and the whole string is built
+    with plain integer formatting, skipping strftime's format-specifier and
+    timezone machinery.
+    """
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
+            f"T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}.000+0000")
+
 def get_date_range(days: int = 1) -> tuple[str, str]:
     """
     Returns a tuple of (start_date, end_date) in Toast API required format: yyyy-MM-dd'T'HH:mm:ss.SSSZ
     Example: 2016-01-01T14:13:12.000+0400
     """
     end_dt = datetime.now(timezone.utc).replace(microsecond=0)
-    start_dt = end_dt - timedelta(days=days)
+
+    # UTC has no DST, so going back `days` days is a plain seconds subtraction;
+    # one C constructor call instead of building and applying a timedelta
+    start_dt = datetime.fromtimestamp(end_dt.timestamp() - days * 86400, tz=timezone.utc)
 
     # Format with milliseconds and timezone offset (+0000 for UTC)
-    end_date = end_dt.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
-    start_date = start_dt.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+    end_date = _format_toast_timestamp(end_dt)
+    start_date = _format_toast_timestamp(start_dt)
 
     return start_date, end_date
\ No newline at end of file